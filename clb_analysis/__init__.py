@@ -0,0 +1,15 @@
+"""
+clb gene analysis of shotgun metagenomic data (pks+ E. coli)
+
+Pipeline steps (importable without pandas; pandas/openpyxl are only
+loaded when countlead writes the Excel file):
+
+- fastq_to_fasta: FASTQ to FASTA conversion (Step 4)
+- fastaseq: paired-read FASTA merging (Step 5)
+- blast_search: BLAST database construction and search (Step 6)
+- countlead: clb gene read count aggregation (Step 7)
+- screening: fast pks+ presence/absence screening
+
+Command line: clb-analysis <subcommand> (or python -m clb_analysis)
+"""
+__version__ = "0.1.0"
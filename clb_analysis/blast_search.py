@@ -0,0 +1,152 @@
+"""
+BLAST database construction and search (Step 6)
+
+Python equivalent of BlastDB(for loop).sh: output folders, file names and
+processed_files.log entries are the same, so both can be used on one output directory.
+"""
+import os
+import subprocess
+import time
+
+DB_EXTENSIONS = ("ndb", "nhr", "nin", "njs", "nog", "nos", "not", "nsq", "ntf", "nto")
+
+def _log(message, log_file):
+    """
+    Print a message and append it to the log file (same as `echo ... | tee -a`)
+    """
+    print(message)
+    with open(log_file, 'a') as f:
+        f.write(message + "\n")
+
+def _blast_command(blast_dir, name):
+    """
+    Return the path of a BLAST executable, using the .exe version if present (Windows)
+    """
+    path = os.path.join(blast_dir, name)
+    if not os.path.exists(path) and os.path.exists(path + ".exe"):
+        return path + ".exe"
+    return path
+
+def run_blast_search(input_dir, query_file, blast_db_folder, blast_dir,
+                     perc_identity=97, evalue="1e-5", max_target_seqs=10000000, num_threads=2):
+    """
+    Build a BLAST database for each combined FASTA file (*.fa) and search the clb genes against it
+
+    Samples already recorded as completed with the same parameters in
+    processed_files.log are skipped.
+
+    Args:
+        input_dir (str): Directory containing combined FASTA files
+        query_file (str): clb_genes.fna path
+        blast_db_folder (str): Directory for BLAST databases and results
+        blast_dir (str): BLAST executable directory
+        perc_identity (int): Nucleotide sequence identity threshold (%)
+        evalue (str): E-value threshold
+        max_target_seqs (int): Maximum number of target sequences
+        num_threads (int): Number of BLAST threads
+
+    Returns:
+        list: Paths to the TSV result files of the samples processed in this run
+    """
+    makeblastdb_cmd = _blast_command(blast_dir, "makeblastdb")
+    blastn_cmd = _blast_command(blast_dir, "blastn")
+
+    # Configuration verification
+    if not os.path.isdir(input_dir):
+        raise FileNotFoundError(f"Input directory not found: {input_dir}")
+    if not os.path.isfile(query_file):
+        raise FileNotFoundError(f"Query file not found: {query_file}")
+    for cmd in (makeblastdb_cmd, blastn_cmd):
+        if not os.path.isfile(cmd):
+            raise FileNotFoundError(f"BLAST executable not found: {cmd}")
+
+    # Parameter validation
+    if not 60 <= float(perc_identity) <= 100:
+        print(f"Warning: Nucleotide sequence identity threshold ({perc_identity}%) is outside recommended range.")
+        print("Validated within 60-90% range in referenced studies.")
+
+    input_files = sorted(f for f in os.listdir(input_dir) if f.endswith('.fa'))
+    if not input_files:
+        raise FileNotFoundError(f"No .fa files found in {input_dir}")
+
+    os.makedirs(blast_db_folder, exist_ok=True)
+    log_file = os.path.join(blast_db_folder, "processed_files.log")
+    error_log = os.path.join(blast_db_folder, "error.log")
+    open(log_file, 'a').close()
+
+    query_file = os.path.abspath(query_file)
+    param_suffix = f"identity{perc_identity}_evalue{evalue}"
+    blastn_options = ["-query", query_file,
+                      "-evalue", str(evalue),
+                      "-max_target_seqs", str(max_target_seqs),
+                      "-perc_identity", str(perc_identity),
+                      "-num_threads", str(num_threads)]
+
+    _log(f"Starting batch processing of FASTA files at {time.ctime()}", log_file)
+    _log(f"Parameters: identity={perc_identity}%, evalue={evalue}", log_file)
+    _log("-------------------------------------------", log_file)
+
+    output_files = []
+    for file_base in input_files:
+        input_file = os.path.abspath(os.path.join(input_dir, file_base))
+        sample_name = file_base[:-len('.fa')]
+        run_name = f"{sample_name}_{param_suffix}"
+
+        # Check if already processed (including parameters)
+        with open(log_file) as f:
+            if f"{run_name} completed" in f.read():
+                _log(f"Skipping {sample_name} - already processed with current parameters", log_file)
+                continue
+
+        _log(f"Processing file: {file_base} ({time.ctime()})", log_file)
+
+        # Create dedicated folder for sample (including parameters)
+        sample_folder = os.path.join(blast_db_folder, run_name)
+        os.makedirs(sample_folder, exist_ok=True)
+        output_tsv = os.path.join(sample_folder, f"{run_name}.tsv")
+        output_alignment = os.path.join(sample_folder, f"{run_name}_alignment.txt")
+
+        # Create database only if it doesn't exist
+        if all(os.path.isfile(os.path.join(sample_folder, f"{sample_name}.{ext}")) for ext in DB_EXTENSIONS):
+            _log(f"BLAST database already exists for {sample_name}. Skipping database creation.", log_file)
+        else:
+            _log(f"Creating BLAST database for {sample_name}...", log_file)
+            result = subprocess.run([makeblastdb_cmd, "-in", input_file, "-dbtype", "nucl",
+                                     "-out", sample_name, "-title", sample_name, "-parse_seqids"],
+                                    cwd=sample_folder)
+            if result.returncode != 0:
+                _log(f"Error creating BLAST database for {sample_name}", error_log)
+                continue
+            _log(f"BLAST database creation complete for {sample_name}.", log_file)
+
+        # BLAST search (with alignment information, then tab-delimited TSV output)
+        _log(f"Running interactive BLAST search for {sample_name} with identity={perc_identity}%...", log_file)
+        subprocess.run([blastn_cmd, "-db", sample_name, "-out", output_alignment, "-outfmt", "7"]
+                       + blastn_options, cwd=sample_folder)
+        _log(f"Running structured BLAST search for {sample_name} with identity={perc_identity}%...", log_file)
+        subprocess.run([blastn_cmd, "-db", sample_name, "-out", output_tsv, "-outfmt", "6"]
+                       + blastn_options, cwd=sample_folder)
+
+        # Verify results
+        if os.path.isfile(output_tsv) and os.path.getsize(output_tsv) > 0:
+            with open(output_tsv) as f:
+                hits = sum(1 for _ in f)
+            _log(f"Results saved in {output_tsv}", log_file)
+            _log(f"Number of hits found: {hits} (identity≥{perc_identity}%)", log_file)
+        else:
+            _log(f"No BLAST hits found for {sample_name} with identity≥{perc_identity}%.", log_file)
+
+        if os.path.isfile(output_alignment) and os.path.getsize(output_alignment) > 0:
+            _log(f"Alignment results saved in {output_alignment}", log_file)
+        else:
+            _log(f"No alignment output generated for {sample_name}.", log_file)
+
+        # Record processing completion (including parameters)
+        _log(f"{run_name} completed at {time.ctime()}", log_file)
+        _log("-------------------------------------------", log_file)
+        output_files.append(output_tsv)
+
+    _log(f"All files have been processed with parameters: identity={perc_identity}%, evalue={evalue}", log_file)
+    _log(f"Batch processing completed at {time.ctime()}", log_file)
+
+    return output_files
@@ -0,0 +1,233 @@
+"""
+Command line interface: clb-analysis <subcommand> [options]
+
+Each subcommand can also read its parameters from an INI config file
+(--config FILE), using one section per subcommand, e.g.
+
+    [screen]
+    input_dir = /path/to/combined/fasta/files
+    query_file = /path/to/clb_genes.fna
+    blast_dir = /path/to/blast/bin
+    output = /path/to/output/pks_screening.tsv
+    criterion = cluster
+
+Command line flags override values from the config file. Pipeline modules are
+imported only when their subcommand runs, so quick jobs start immediately.
+"""
+import argparse
+import configparser
+import subprocess
+import sys
+
+def _add_blast_options(parser):
+    """
+    BLAST search parameters shared by the blast and screen subcommands
+    """
+    parser.add_argument("--blast-dir", help="BLAST executable directory")
+    parser.add_argument("--query-file", help="clb_genes.fna path")
+    parser.add_argument("--perc-identity", type=int, default=97,
+                        help="Nucleotide sequence identity threshold in %% (default: 97)")
+    parser.add_argument("--evalue", default="1e-5", help="E-value threshold (default: 1e-5)")
+    parser.add_argument("--num-threads", type=int, default=2, help="Number of BLAST threads (default: 2)")
+
+def run_convert(args):
+    from .fastq_to_fasta import process_dra_directory
+    print(f"FASTQ to FASTA Conversion")
+    print(f"Input directory: {args.input_dir}")
+    print(f"Output directory: {args.output_dir}")
+    print("-" * 50)
+    process_dra_directory(args.input_dir, args.output_dir)
+
+def run_combine(args):
+    from .fastaseq import combine_cohort, combine_sample
+    print(f"FASTA Sequence Concatenation")
+    print(f"Target accession: {args.accession or 'all *_1.fa/*_2.fa pairs'}")
+    print(f"Input folder: {args.input_dir}")
+    print(f"Output folder: {args.output_dir}")
+    print("-" * 50)
+    if args.accession:
+        combine_sample(args.input_dir, args.accession, args.output_dir)
+    else:
+        results = combine_cohort(args.input_dir, args.output_dir, workers=args.workers)
+        if any(r["error"] for r in results):
+            return 1
+
+def run_blast(args):
+    from .blast_search import run_blast_search
+    print(f"BLAST Database Construction and Search")
+    print(f"Input directory: {args.input_dir}")
+    print(f"Query file: {args.query_file}")
+    print(f"Output directory: {args.output_dir}")
+    print(f"Nucleotide sequence identity threshold: {args.perc_identity}%")
+    print(f"E-value threshold: {args.evalue}")
+    print("-" * 50)
+    run_blast_search(args.input_dir, args.query_file, args.output_dir, args.blast_dir,
+                     perc_identity=args.perc_identity, evalue=args.evalue,
+                     max_target_seqs=args.max_target_seqs, num_threads=args.num_threads)
+
+def run_count(args):
+    from .countlead import aggregate_counts
+    print(f"clb Gene Count Analysis")
+    print(f"Input directory: {args.input_dir}")
+    print(f"FASTA directory: {args.fasta_dir}")
+    print(f"Output file: {args.output}")
+    print(f"Parameter-specific output: {args.separate_by_parameters}")
+    print("-" * 50)
+    aggregate_counts(args.input_dir, args.output, fasta_dir=args.fasta_dir,
+                     separate_by_parameters=args.separate_by_parameters)
+
+def run_screen(args):
+    from .screening import screen_directory
+    print(f"pks+ Presence/Absence Screening")
+    print(f"Input directory: {args.input_dir}")
+    print(f"Query file: {args.query_file}")
+    print(f"Output file: {args.output}")
+    print(f"Criterion: {args.criterion} ≥ {args.hit_threshold} reads, max depth: {args.max_depth or 'no limit'}, "
+          f"target confidence: {args.target_confidence or 'none'}")
+    print("-" * 50)
+    results = screen_directory(args.input_dir, args.query_file, args.blast_dir, args.output,
+                               criterion=args.criterion, hit_threshold=args.hit_threshold,
+                               initial_batch=args.initial_batch, growth_factor=args.growth_factor,
+                               max_depth=args.max_depth, target_confidence=args.target_confidence,
+                               subsample_fraction=args.subsample_fraction, seed=args.seed,
+                               min_rpm=args.min_rpm, perc_identity=args.perc_identity,
+                               evalue=args.evalue, num_threads=args.num_threads)
+    if any(r["Status"] != "ok" for r in results):
+        return 1
+
+# Subcommand -> (handler, options that must be given on the command line or in the config file)
+COMMANDS = {
+    "convert": (run_convert, ["input_dir", "output_dir"]),
+    "combine": (run_combine, ["input_dir", "output_dir"]),
+    "blast": (run_blast, ["input_dir", "query_file", "output_dir", "blast_dir"]),
+    "count": (run_count, ["input_dir", "output"]),
+    "screen": (run_screen, ["input_dir", "query_file", "output", "blast_dir"]),
+}
+
+def build_parser():
+    """
+    Build the argument parser with one subparser per pipeline step
+
+    Returns:
+        tuple: (main parser, dict of subcommand name -> subparser)
+    """
+    parser = argparse.ArgumentParser(prog="clb-analysis",
+                                     description="clb gene analysis of shotgun metagenomic data")
+    parser.add_argument("--config", help="INI config file with one section per subcommand")
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.required = True
+
+    p = subparsers.add_parser("convert", help="Step 4: convert FASTQ files to FASTA")
+    p.add_argument("--input-dir", help="Directory containing FASTQ files (.fastq/.fq, .bz2/.gz)")
+    p.add_argument("--output-dir", help="Output base directory")
+
+    p = subparsers.add_parser("combine", help="Step 5: combine _1/_2 FASTA files of one accession or a whole cohort")
+    p.add_argument("--input-dir", help="Folder containing {accession}_1.fa and {accession}_2.fa")
+    p.add_argument("--accession", help="Accession number (e.g., DRR171459); omit to combine all pairs in --input-dir")
+    p.add_argument("--output-dir", help="Output folder for the combined file")
+    p.add_argument("--workers", type=int, help="Parallel worker processes for all pairs (default: number of CPUs)")
+
+    p = subparsers.add_parser("blast", help="Step 6: build BLAST databases and search clb genes")
+    p.add_argument("--input-dir", help="Directory containing combined FASTA files")
+    p.add_argument("--output-dir", help="Directory for BLAST databases and results")
+    _add_blast_options(p)
+    p.add_argument("--max-target-seqs", type=int, default=10000000,
+                   help="Maximum number of target sequences (default: 10000000)")
+
+    p = subparsers.add_parser("count", help="Step 7: aggregate clb gene read counts into Excel")
+    p.add_argument("--input-dir", help="Directory containing BLAST result files (*_alignment.txt)")
+    p.add_argument("--fasta-dir", help="Directory containing combined FASTA files (for total read count)")
+    p.add_argument("--output", help="Output Excel file path")
+    p.add_argument("--no-separate-by-parameters", dest="separate_by_parameters", action="store_false",
+                   help="Do not write one sheet per parameter set")
+
+    p = subparsers.add_parser("screen", help="Fast pks+ presence/absence screening with early termination")
+    p.add_argument("--input-dir", help="Directory containing combined FASTA files")
+    p.add_argument("--output", help="Output TSV file path")
+    _add_blast_options(p)
+    p.add_argument("--criterion", choices=["clbB", "cluster"], default="clbB",
+                   help="Positivity criterion (default: clbB)")
+    p.add_argument("--hit-threshold", type=int, default=1,
+                   help="Unique clb reads required for a positive call (default: 1)")
+    p.add_argument("--initial-batch", type=int, default=100000, help="Reads in the first batch (default: 100000)")
+    p.add_argument("--growth-factor", type=float, default=2.0, help="Batch size multiplier (default: 2.0)")
+    p.add_argument("--max-depth", type=int, default=0,
+                   help="Negative if not positive by this many reads, 0 = no limit (default: 0)")
+    p.add_argument("--target-confidence", type=float, default=0.95,
+                   help="Negative once a sample at --min-rpm would have been detected with this "
+                        "probability, 0 = off (default: 0.95)")
+    p.add_argument("--subsample-fraction", type=float, default=1.0,
+                   help="Fraction of reads used after random subsampling (default: 1.0)")
+    p.add_argument("--seed", type=int, default=0, help="Random seed for subsampling (default: 0)")
+    p.add_argument("--min-rpm", type=float, default=0.0166,
+                   help="Abundance (RPM) a negative call should rule out (default: 0.0166)")
+
+    return parser, dict(subparsers.choices)
+
+def apply_config(parser, commands, args, argv):
+    """
+    Re-parse argv with defaults taken from the [<command>] section of the config file
+
+    Args:
+        parser (argparse.ArgumentParser): Main parser returned by build_parser
+        commands (dict): Subparsers returned by build_parser
+        args (argparse.Namespace): First-pass parse result (for --config and command)
+        argv (list): Command line arguments
+
+    Returns:
+        argparse.Namespace: Arguments with config file values filled in
+    """
+    config = configparser.ConfigParser()
+    if not config.read(args.config):
+        parser.error(f"Config file not found: {args.config}")
+    if not config.has_section(args.command):
+        return args
+
+    section = config[args.command]
+    subparser = commands[args.command]
+    actions = {action.dest: action for action in subparser._actions}
+    defaults = {}
+    for key in section:
+        dest = key.replace("-", "_")
+        if dest not in actions or dest == "help":
+            parser.error(f"Unknown option in [{args.command}] section of {args.config}: {key}")
+        action = actions[dest]
+        if isinstance(action.const, bool):
+            defaults[dest] = section.getboolean(key)
+            continue
+        # argparse applies the option type to string defaults, but does not check choices
+        if action.choices is not None and section[key] not in action.choices:
+            parser.error(f"Invalid value in [{args.command}] section of {args.config}: {key} = {section[key]} "
+                         f"(choose from {', '.join(map(str, action.choices))})")
+        defaults[dest] = section[key]
+    subparser.set_defaults(**defaults)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """
+    Entry point of the clb-analysis command
+
+    Args:
+        argv (list): Command line arguments (default: sys.argv[1:])
+
+    Returns:
+        int: Exit status
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    parser, commands = build_parser()
+    args = parser.parse_args(argv)
+    if args.config:
+        args = apply_config(parser, commands, args, argv)
+
+    handler, required = COMMANDS[args.command]
+    missing = [name for name in required if getattr(args, name) is None]
+    if missing:
+        parser.error(f"{args.command}: missing required option(s): "
+                     + ", ".join("--" + name.replace("_", "-") for name in missing))
+
+    try:
+        return handler(args) or 0
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        print(f"Error: {e}")
+        return 1
@@ -0,0 +1,249 @@
+"""
+Paired-read FASTA merging (Step 5)
+"""
+import os
+import re
+import glob
+from concurrent.futures import ProcessPoolExecutor
+
+# Size of the blocks read and written at once when rewriting headers
+BLOCK_SIZE = 8 * 1024 * 1024
+
+# Header line split into sequence ID (first token, including the preceding newline) and the rest
+HEADER_PATTERN = re.compile(rb'(\n>\S*)([^\n]*)')
+
+def _rewrite_headers(lines, suffix):
+    """
+    Append suffix to the sequence ID of every header line in a block of complete lines.
+    The rest of the header is written as " rest" with surrounding whitespace removed,
+    as in the original line-by-line version (strip().split(None, 1)).
+
+    Args:
+        lines (bytes): Block starting at the beginning of a line, with "\n" line endings
+        suffix (bytes): Suffix including the leading ":" (e.g., b":1")
+
+    Returns:
+        tuple: (rewritten block, number of header lines)
+    """
+    # The leading newline lets a header on the first line of the block match as well
+    parts = HEADER_PATTERN.split(b'\n' + lines)
+    headers = parts[1::3]
+    parts[1::3] = [header + suffix for header in headers]
+    parts[2::3] = [b' ' + rest if rest else rest for rest in (rest.strip() for rest in parts[2::3])]
+    return b''.join(parts)[1:], len(headers)
+
+def process_and_write_fasta(input_path, suffix, output_handle, block_size=BLOCK_SIZE):
+    """
+    Read the specified FASTA file in large byte blocks.
+    For header lines (lines starting with ">"), append ":{suffix}" to the end of the initial sequence ID portion and output.
+    Output all other lines as is.
+
+    Each block is cut at its last newline so that header lines are never split,
+    and is written back with a single write call. Line endings are converted to
+    "\n" as in text mode, so for headers using ASCII whitespace the output is the same as the original
+    line-by-line version, except that a missing newline at the end of the file is added
+    (otherwise the last line would run into the first header of the _2 file).
+
+    Args:
+        input_path (str): Input FASTA file path
+        suffix (int or str): Suffix appended to each sequence ID (1 for forward, 2 for reverse reads)
+        output_handle: Output file opened in binary mode
+        block_size (int): Number of bytes read at once
+
+    Returns:
+        int: Number of reads (header lines) written
+    """
+    suffix = b':' + str(suffix).encode()
+    n_reads = 0
+    remainder = b''
+    with open(input_path, 'rb') as infile:
+        while True:
+            block = infile.read(block_size)
+            if not block:
+                break
+            block = remainder + block
+            held_cr = b''
+            if b'\r' in block:
+                # Keep a trailing "\r" for the next block, it may be the first half of "\r\n"
+                if block.endswith(b'\r'):
+                    block, held_cr = block[:-1], b'\r'
+                block = block.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+            cut = block.rfind(b'\n') + 1
+            remainder = block[cut:] + held_cr
+            if cut == 0:
+                # No complete line in this block yet
+                continue
+            rewritten, n = _rewrite_headers(block[:cut], suffix)
+            output_handle.write(rewritten)
+            n_reads += n
+    if remainder:
+        remainder = remainder.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        if not remainder.endswith(b'\n'):
+            # Last line without a trailing newline
+            remainder += b'\n'
+        rewritten, n = _rewrite_headers(remainder, suffix)
+        output_handle.write(rewritten)
+        n_reads += n
+    return n_reads
+
+def combine_fasta_files(fasta1_path, fasta2_path, output_path, check_pairs=True):
+    """
+    Process FASTA files for _1 and _2 in large blocks,
+    add ":1" for forward reads and ":2" for reverse reads, concatenate them, and write to output_path.
+
+    The output is written to "{output_path}.partial" and only renamed to output_path
+    once both files have been processed (and, with check_pairs, contain the same number of reads).
+
+    Args:
+        fasta1_path (str): Forward read FASTA file (_1)
+        fasta2_path (str): Reverse read FASTA file (_2)
+        output_path (str): Combined FASTA file path
+        check_pairs (bool): Fail if the two files have different read counts
+
+    Returns:
+        tuple: (forward read count, reverse read count)
+    """
+    partial_path = output_path + ".partial"
+    try:
+        with open(partial_path, 'wb') as out_f:
+            n_reads1 = process_and_write_fasta(fasta1_path, 1, out_f)
+            n_reads2 = process_and_write_fasta(fasta2_path, 2, out_f)
+        if check_pairs and n_reads1 != n_reads2:
+            raise ValueError(f"Read count mismatch between mates: {fasta1_path} has {n_reads1} reads, "
+                             f"{fasta2_path} has {n_reads2} reads")
+        os.replace(partial_path, output_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    print(f"Concatenation completed: {output_path} ({n_reads1} + {n_reads2} reads)")
+    return n_reads1, n_reads2
+
+def combine_sample(folder, drr, output_folder):
+    """
+    Combine the _1 and _2 FASTA files of one accession into a single FASTA file
+
+    Args:
+        folder (str): Folder containing {drr}_1.fa and {drr}_2.fa
+        drr (str): Accession number (e.g., "DRR171459")
+        output_folder (str): Output folder for the combined file
+
+    Returns:
+        str: Path to the combined FASTA file ({output_folder}/{drr}.fa)
+    """
+    fasta1_path = os.path.join(folder, f"{drr}_1.fa")
+    fasta2_path = os.path.join(folder, f"{drr}_2.fa")
+
+    # File existence check
+    for path in (fasta1_path, fasta2_path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+
+    # Create output folder if it does not exist
+    os.makedirs(output_folder, exist_ok=True)
+    output_path = os.path.join(output_folder, f"{drr}.fa")
+
+    print(f"Processing: {drr}")
+    print(f"  Input 1: {fasta1_path}")
+    print(f"  Input 2: {fasta2_path}")
+    print(f"  Output: {output_path}")
+
+    combine_fasta_files(fasta1_path, fasta2_path, output_path)
+    return output_path
+
+def find_fasta_pairs(folder):
+    """
+    Find all {accession}_1.fa / {accession}_2.fa pairs in folder and its subfolders
+    (e.g., the per-accession folders created by fastq_to_fasta)
+
+    Args:
+        folder (str): Folder to search
+
+    Returns:
+        tuple: (list of (accession, fasta1_path, fasta2_path),
+                list of _1.fa and _2.fa files without a mate)
+    """
+    if not os.path.exists(folder):
+        raise FileNotFoundError(f"Input folder not found: {folder}")
+
+    pairs = []
+    unpaired = []
+    for fasta1_path in sorted(glob.glob(os.path.join(folder, "**", "*_1.fa"), recursive=True)):
+        fasta2_path = fasta1_path[:-len("_1.fa")] + "_2.fa"
+        if os.path.exists(fasta2_path):
+            accession = os.path.basename(fasta1_path)[:-len("_1.fa")]
+            pairs.append((accession, fasta1_path, fasta2_path))
+        else:
+            unpaired.append(fasta1_path)
+    for fasta2_path in sorted(glob.glob(os.path.join(folder, "**", "*_2.fa"), recursive=True)):
+        if not os.path.exists(fasta2_path[:-len("_2.fa")] + "_1.fa"):
+            unpaired.append(fasta2_path)
+    return pairs, unpaired
+
+def _combine_pair(task):
+    """
+    Worker function for combine_cohort: combine one pair and report the outcome instead of raising
+    """
+    accession, fasta1_path, fasta2_path, output_path = task
+    try:
+        n_reads1, n_reads2 = combine_fasta_files(fasta1_path, fasta2_path, output_path)
+    except (OSError, ValueError) as e:
+        return {"accession": accession, "output": None, "reads": None, "error": str(e)}
+    return {"accession": accession, "output": output_path, "reads": n_reads1, "error": None}
+
+def combine_cohort(folder, output_folder, workers=None):
+    """
+    Combine every _1/_2 FASTA pair found in folder, using parallel worker processes
+
+    Files without a mate, and accessions found in more than one subfolder (which
+    would be written to the same output file), are not combined and are returned
+    as errors.
+
+    Args:
+        folder (str): Folder containing {accession}_1.fa and {accession}_2.fa files (searched recursively)
+        output_folder (str): Output folder for the combined files ({accession}.fa)
+        workers (int): Number of worker processes (default: number of CPUs)
+
+    Returns:
+        list: One result dict per pair or unpaired file (accession, output, reads per mate, error)
+    """
+    pairs, unpaired = find_fasta_pairs(folder)
+    if not pairs and not unpaired:
+        raise FileNotFoundError(f"No *_1.fa/*_2.fa pairs found in {folder}")
+
+    errors = []
+    for path in unpaired:
+        accession = os.path.basename(path)[:-len("_1.fa")]
+        errors.append({"accession": accession, "output": None, "reads": None,
+                       "error": f"No mate found for {path}"})
+
+    folders_by_accession = {}
+    for accession, fasta1_path, _ in pairs:
+        folders_by_accession.setdefault(accession, []).append(os.path.dirname(fasta1_path))
+    tasks = []
+    for accession, fasta1_path, fasta2_path in pairs:
+        if len(folders_by_accession[accession]) > 1:
+            errors.append({"accession": accession, "output": None, "reads": None,
+                           "error": f"Accession found in more than one folder, not combined: {fasta1_path}"})
+            continue
+        tasks.append((accession, fasta1_path, fasta2_path, os.path.join(output_folder, f"{accession}.fa")))
+
+    results = []
+    if tasks:
+        os.makedirs(output_folder, exist_ok=True)
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        print(f"Number of pairs: {len(tasks)} (workers: {workers})")
+        if workers == 1:
+            results = [_combine_pair(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_combine_pair, tasks))
+    results += errors
+
+    failed = [r for r in results if r["error"]]
+    for r in failed:
+        print(f"  → Failed: {r['accession']}: {r['error']}")
+    print(f"\nProcessing completed:")
+    print(f"  Combined pairs: {len(results) - len(failed)}/{len(results)}")
+    print(f"  Output folder: {output_folder}")
+
+    return results
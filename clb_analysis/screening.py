@@ -0,0 +1,445 @@
+"""
+Fast pks+ presence/absence screening with early termination
+"""
+import os
+import csv
+import math
+import random
+import shutil
+import subprocess
+import tempfile
+
+from .blast_search import _blast_command
+
+# Marker gene used for the single gene pks+ determination criterion
+CLBB_GENE = "clbB"
+
+# screen_sample parameters checked by check_screening_options
+CHECKED_OPTIONS = ("hit_threshold", "initial_batch", "growth_factor", "max_depth",
+                   "target_confidence", "subsample_fraction", "min_rpm")
+
+# Columns of the screening result file
+RESULT_COLUMNS = ["Sample", "Criterion", "Hit_threshold", "Subsample_fraction",
+                  "Reads_scanned", "Reads_screened", "Batches", "Early_stopped", "Stop_reason",
+                  "Estimated_db_size", "clbB_reads", "Total_clb_reads", "Detected_genes_count",
+                  "pks_positive_clbB", "pks_positive_cluster", "Confidence", "Status"]
+
+def iter_fasta_records(fasta_path):
+    """
+    Stream FASTA records one at a time without loading the file into memory
+
+    Args:
+        fasta_path (str): Path to FASTA file
+
+    Yields:
+        tuple: (header line, list of sequence lines), lines keep their newline
+    """
+    header = None
+    seq_lines = []
+    with open(fasta_path, 'r') as f:
+        for line in f:
+            if line.startswith('>'):
+                if header is not None:
+                    yield header, seq_lines
+                header = line if line.endswith('\n') else line + '\n'
+                seq_lines = []
+            elif header is not None:
+                seq_lines.append(line if line.endswith('\n') else line + '\n')
+    if header is not None:
+        yield header, seq_lines
+
+def progressive_batch_sizes(initial_batch, growth_factor, max_depth):
+    """
+    Generate progressively larger batch sizes until max_depth reads are covered
+
+    Args:
+        initial_batch (int): Number of reads in the first batch
+        growth_factor (float): Multiplier applied to each subsequent batch
+        max_depth (int): Maximum number of reads to search (0 or None for no limit)
+
+    Yields:
+        int: Number of reads in each batch
+    """
+    size = max(1, int(initial_batch))
+    searched = 0
+    while not max_depth or searched < max_depth:
+        if max_depth:
+            size = min(size, max_depth - searched)
+        yield size
+        searched += size
+        size = max(size + 1, int(size * growth_factor))
+
+def read_key_from_subject(subject):
+    """
+    Convert a BLAST subject ID into a read key shared by both mates
+    (e.g., "DRR171459.16276716:2" -> "DRR171459.16276716"),
+    so that forward and reverse hits of the same read are counted once
+    """
+    base, sep, mate = subject.rpartition(':')
+    if sep and mate in ('1', '2'):
+        return base
+    return subject
+
+def search_batch(batch_fasta, work_dir, query_file, blast_dir, perc_identity, evalue, num_threads,
+                 db_size=None):
+    """
+    Build a BLAST database for one read batch and search the clb genes against it
+
+    BLAST scales E-values with the database size, so db_size should be the size of
+    the full sample (as searched in Steps 6-7) to keep the E-value cutoff comparable.
+
+    Args:
+        batch_fasta (str): FASTA file containing the batch reads
+        work_dir (str): Directory for the temporary batch database
+        query_file (str): clb_genes.fna path
+        blast_dir (str): BLAST executable directory
+        perc_identity (float): Nucleotide sequence identity threshold (%)
+        evalue (float): E-value threshold
+        num_threads (int): Number of BLAST threads
+        db_size (int): Effective database length (residues) passed as -dbsize (None for the batch size)
+
+    Returns:
+        list: (query, subject) pairs for every BLAST hit
+    """
+    db_name = os.path.join(work_dir, "batch")
+    subprocess.run([_blast_command(blast_dir, "makeblastdb"),
+                    "-in", batch_fasta, "-dbtype", "nucl",
+                    "-out", db_name, "-parse_seqids"],
+                   check=True, stdout=subprocess.DEVNULL)
+    result = subprocess.run([_blast_command(blast_dir, "blastn"),
+                             "-query", query_file,
+                             "-db", db_name,
+                             "-outfmt", "6 qseqid sseqid",
+                             "-evalue", str(evalue),
+                             "-max_target_seqs", "10000000",
+                             "-perc_identity", str(perc_identity),
+                             "-num_threads", str(num_threads)]
+                            + (["-dbsize", str(int(db_size))] if db_size else []),
+                            check=True, stdout=subprocess.PIPE, universal_newlines=True)
+    hits = []
+    for line in result.stdout.splitlines():
+        parts = line.split("\t")
+        if len(parts) >= 2:
+            hits.append((parts[0], parts[1]))
+    return hits
+
+def detection_confidence(reads_screened, min_rpm, hit_threshold):
+    """
+    Probability that a sample carrying clb reads at min_rpm would have produced
+    at least hit_threshold hits within reads_screened reads (Poisson model)
+
+    Args:
+        reads_screened (int): Number of reads searched
+        min_rpm (float): Minimum abundance to detect (Reads Per Million)
+        hit_threshold (int): Number of hits required for a positive call
+
+    Returns:
+        float: Detection probability between 0 and 1
+    """
+    expected = reads_screened * min_rpm / 1000000.0
+    # P(X >= k) = 1 - sum_{i<k} e^-λ λ^i / i!
+    term = math.exp(-expected)
+    below = 0.0
+    for i in range(hit_threshold):
+        if i > 0:
+            term *= expected / i
+        below += term
+    return max(0.0, min(1.0, 1.0 - below))
+
+def depth_for_confidence(target_confidence, min_rpm, hit_threshold):
+    """
+    Smallest number of reads for which detection_confidence reaches target_confidence
+
+    Args:
+        target_confidence (float): Required detection probability (0 < target < 1)
+        min_rpm (float): Minimum abundance to detect (Reads Per Million)
+        hit_threshold (int): Number of hits required for a positive call
+
+    Returns:
+        int: Required screening depth (reads)
+    """
+    if not 0 < target_confidence < 1:
+        raise ValueError(f"Target confidence must be between 0 and 1: {target_confidence}")
+    if min_rpm <= 0:
+        raise ValueError(f"Minimum abundance (RPM) must be positive: {min_rpm}")
+    low, high = 0, 1000000
+    while detection_confidence(high, min_rpm, hit_threshold) < target_confidence:
+        low, high = high, high * 2
+    # Bisection: confidence(low) < target <= confidence(high)
+    while high - low > 1:
+        mid = (low + high) // 2
+        if detection_confidence(mid, min_rpm, hit_threshold) < target_confidence:
+            low = mid
+        else:
+            high = mid
+    return high
+
+def check_screening_options(criterion="clbB", hit_threshold=1, initial_batch=100000, growth_factor=2.0,
+                            max_depth=0, target_confidence=0.95, subsample_fraction=1.0, min_rpm=0.0166):
+    """
+    Check screening parameters, raising ValueError for values that would give meaningless calls
+
+    Args:
+        See screen_sample
+    """
+    if criterion not in ("clbB", "cluster"):
+        raise ValueError(f"Unknown criterion: {criterion} (use 'clbB' or 'cluster')")
+    if hit_threshold < 1:
+        raise ValueError(f"Hit threshold must be at least 1: {hit_threshold}")
+    if initial_batch < 1:
+        raise ValueError(f"Initial batch size must be at least 1: {initial_batch}")
+    if growth_factor < 1:
+        raise ValueError(f"Growth factor must be at least 1: {growth_factor}")
+    if max_depth < 0:
+        raise ValueError(f"Maximum depth must not be negative: {max_depth}")
+    if not 0 < subsample_fraction <= 1:
+        raise ValueError(f"Subsample fraction must be greater than 0 and at most 1: {subsample_fraction}")
+    if target_confidence:
+        if not 0 < target_confidence < 1:
+            raise ValueError(f"Target confidence must be between 0 and 1: {target_confidence}")
+        if min_rpm <= 0:
+            raise ValueError(f"Minimum abundance (RPM) must be positive: {min_rpm}")
+
+def screen_sample(fasta_path, query_file, blast_dir, criterion="clbB", hit_threshold=1,
+                  initial_batch=100000, growth_factor=2.0, max_depth=0, target_confidence=0.95,
+                  subsample_fraction=1.0, seed=0, min_rpm=0.0166,
+                  perc_identity=97, evalue=1e-5, num_threads=2, confident_depth=None):
+    """
+    Screen one sample for pks+ status, stopping as soon as the positivity criterion is met
+
+    Reads are streamed from the FASTA file (optionally randomly subsampled) in
+    progressively larger batches. Each batch is searched on its own, and the
+    unique clb reads are accumulated across batches. Screening stops when the
+    criterion is met (positive), or (negative) when enough reads have been
+    searched for the negative call to reach target_confidence at min_rpm, when
+    max_depth reads have been searched, or when the file is exhausted.
+
+    Only the selected criterion is final. The call for the other criterion is
+    "N/A" when it was not met and the whole file was not read.
+
+    Args:
+        fasta_path (str): Combined FASTA file of the sample
+        query_file (str): clb_genes.fna path
+        blast_dir (str): BLAST executable directory
+        criterion (str): "clbB" (clbB reads) or "cluster" (sum of all clb reads)
+        hit_threshold (int): Number of unique reads required for a positive call
+        initial_batch (int): Number of reads in the first batch
+        growth_factor (float): Batch size multiplier
+        max_depth (int): Maximum number of reads to search (0 for no limit)
+        target_confidence (float): Stop with a negative call once this confidence is reached
+            (None to search up to max_depth or the whole file)
+        subsample_fraction (float): Fraction of reads kept by random subsampling
+        seed (int): Random seed for subsampling
+        min_rpm (float): Abundance (RPM) used for the confidence of negative calls
+        perc_identity (float): Nucleotide sequence identity threshold (%)
+        evalue (float): E-value threshold
+        num_threads (int): Number of BLAST threads
+        confident_depth (int): depth_for_confidence result, if already computed
+
+    Returns:
+        dict: Screening result for the sample
+    """
+    check_screening_options(criterion, hit_threshold, initial_batch, growth_factor,
+                            max_depth, target_confidence, subsample_fraction, min_rpm)
+
+    # Screening depth at which a negative call reaches the target confidence
+    depth_limit = max_depth
+    if target_confidence:
+        if confident_depth is None:
+            confident_depth = depth_for_confidence(target_confidence, min_rpm, hit_threshold)
+        depth_limit = min(max_depth, confident_depth) if max_depth else confident_depth
+
+    rng = random.Random(seed)
+    records = iter_fasta_records(fasta_path)
+    gene_reads = {}
+    reads_scanned = 0
+    reads_screened = 0
+    batches = 0
+    exhausted = False
+    criterion_met = False
+    db_size = None
+    scanned_bytes = 0
+    scanned_residues = 0
+    file_size = os.path.getsize(fasta_path)
+
+    work_dir = tempfile.mkdtemp(prefix="pks_screen_")
+    try:
+        batch_fasta = os.path.join(work_dir, "batch.fa")
+        for batch_size in progressive_batch_sizes(initial_batch, growth_factor, depth_limit):
+            # Collect the next batch of (subsampled) reads
+            n_batch = 0
+            with open(batch_fasta, 'w') as out_f:
+                for header, seq_lines in records:
+                    reads_scanned += 1
+                    if db_size is None:
+                        scanned_bytes += len(header) + sum(len(line) for line in seq_lines)
+                        scanned_residues += sum(len(line.strip()) for line in seq_lines)
+                    if subsample_fraction < 1.0 and rng.random() >= subsample_fraction:
+                        continue
+                    out_f.write(header)
+                    out_f.writelines(seq_lines)
+                    n_batch += 1
+                    if n_batch >= batch_size:
+                        break
+                else:
+                    exhausted = True
+
+            if n_batch == 0:
+                exhausted = True
+                break
+
+            if db_size is None:
+                # Residues of the full file, estimated from the reads scanned for the first batch
+                db_size = scanned_residues if exhausted else max(
+                    scanned_residues, int(file_size * scanned_residues / max(scanned_bytes, 1)))
+
+            batches += 1
+            reads_screened += n_batch
+            for query, subject in search_batch(batch_fasta, work_dir, query_file, blast_dir,
+                                               perc_identity, evalue, num_threads, db_size=db_size):
+                group = query.split(".")[0]
+                gene_reads.setdefault(group, set()).add(read_key_from_subject(subject))
+
+            clbB_count = len(gene_reads.get(CLBB_GENE, ()))
+            cluster_count = sum(len(reads) for reads in gene_reads.values())
+            observed = clbB_count if criterion == "clbB" else cluster_count
+            print(f"  → Batch {batches}: {n_batch} reads (screened {reads_screened}), "
+                  f"clbB={clbB_count}, cluster={cluster_count}")
+
+            if observed >= hit_threshold:
+                criterion_met = True
+                break
+            if exhausted:
+                break
+
+        if not exhausted and next(records, None) is None:
+            # The last batch ended exactly at the end of the file
+            exhausted = True
+    finally:
+        records.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    counts = {group: len(reads) for group, reads in gene_reads.items()}
+    clbB_count = counts.get(CLBB_GENE, 0)
+    cluster_count = sum(counts.values())
+
+    if criterion_met:
+        stop_reason = "criterion_met"
+        confidence = 1.0
+    else:
+        if exhausted or not reads_screened:
+            stop_reason = "end_of_file"
+        elif depth_limit == max_depth:
+            stop_reason = "max_depth"
+        else:
+            stop_reason = "target_confidence"
+        confidence = detection_confidence(reads_screened, min_rpm, hit_threshold)
+
+    # Calls are final for the selected criterion, for positives, and when the whole file was read
+    calls = {}
+    for name, count in (("clbB", clbB_count), ("cluster", cluster_count)):
+        if count >= hit_threshold:
+            calls[name] = 1
+        elif name != criterion and not exhausted:
+            calls[name] = "N/A"
+        else:
+            calls[name] = 0
+
+    return {
+        "Sample": os.path.splitext(os.path.basename(fasta_path))[0],
+        "Criterion": criterion,
+        "Hit_threshold": hit_threshold,
+        "Subsample_fraction": subsample_fraction,
+        "Reads_scanned": reads_scanned,
+        "Reads_screened": reads_screened,
+        "Batches": batches,
+        "Early_stopped": 0 if exhausted else 1,
+        "Stop_reason": stop_reason,
+        "Estimated_db_size": db_size or 0,
+        "clbB_reads": clbB_count,
+        "Total_clb_reads": cluster_count,
+        "Detected_genes_count": sum(1 for count in counts.values() if count > 0),
+        "pks_positive_clbB": calls["clbB"],
+        "pks_positive_cluster": calls["cluster"],
+        "Confidence": round(confidence, 4),
+        "Status": "ok",
+    }
+
+def screen_directory(input_dir, query_file, blast_dir, output_tsv, criterion="clbB", **options):
+    """
+    Screen every combined FASTA file (*.fa) in input_dir and write the results to output_tsv
+
+    Rows are written as soon as each sample is done. A BLAST failure on one sample is
+    recorded in its Status column and screening continues with the next sample.
+
+    Args:
+        input_dir (str): Directory containing combined FASTA files
+        query_file (str): clb_genes.fna path
+        blast_dir (str): BLAST executable directory
+        output_tsv (str): Output TSV file path
+        criterion (str): "clbB" or "cluster"
+        **options: Other screen_sample parameters
+
+    Returns:
+        list: Result dictionaries, one per sample
+    """
+    if not os.path.exists(input_dir):
+        raise FileNotFoundError(f"Input directory not found: {input_dir}")
+    if not os.path.exists(query_file):
+        raise FileNotFoundError(f"Query file not found: {query_file}")
+    for name in ("makeblastdb", "blastn"):
+        if not os.path.isfile(_blast_command(blast_dir, name)):
+            raise FileNotFoundError(f"BLAST executable not found: {_blast_command(blast_dir, name)}")
+
+    # Check parameters before the output file is replaced
+    check_screening_options(criterion, **{key: value for key, value in options.items()
+                                          if key in CHECKED_OPTIONS})
+    target_confidence = options.get("target_confidence", 0.95)
+    if target_confidence:
+        options["confident_depth"] = depth_for_confidence(
+            target_confidence, options.get("min_rpm", 0.0166), options.get("hit_threshold", 1))
+
+    fasta_files = sorted(os.path.join(input_dir, f) for f in os.listdir(input_dir) if f.endswith('.fa'))
+    if not fasta_files:
+        raise FileNotFoundError(f"No .fa files found in {input_dir}")
+
+    output_dir = os.path.dirname(output_tsv)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    results = []
+    with open(output_tsv, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS, delimiter="\t", restval="")
+        writer.writeheader()
+        for fasta_path in fasta_files:
+            print(f"\nScreening: {os.path.basename(fasta_path)}")
+            try:
+                result = screen_sample(fasta_path, query_file, blast_dir, criterion=criterion, **options)
+            except subprocess.CalledProcessError as e:
+                error = f"{os.path.basename(e.cmd[0])} exited with status {e.returncode}"
+            except OSError as e:
+                error = str(e)
+            else:
+                error = None
+            if error:
+                print(f"  → Error: {error}")
+                result = {"Sample": os.path.splitext(os.path.basename(fasta_path))[0],
+                          "Criterion": criterion, "Status": f"error: {error}"}
+            else:
+                call = "positive" if result[f"pks_positive_{criterion}"] == 1 else "negative"
+                print(f"  → {call} after {result['Reads_screened']} reads "
+                      f"({result['Stop_reason']}, confidence {result['Confidence']})")
+            results.append(result)
+            writer.writerow(result)
+            f.flush()
+
+    failed = sum(1 for r in results if r["Status"] != "ok")
+    positives = sum(1 for r in results if r.get(f"pks_positive_{criterion}") == 1)
+    print(f"\nScreening completed:")
+    print(f"  Number of screened samples: {len(results) - failed}/{len(results)}")
+    print(f"  Positive by {criterion} criterion: {positives}/{len(results) - failed} samples")
+    if failed:
+        print(f"  Failed samples: {failed} (see Status column)")
+    print(f"  Results saved to: {output_tsv}")
+
+    return results
@@ -0,0 +1,64 @@
+"""
+pks+ presence/absence screening script
+
+Edit the User Configuration Area and run: python pks_screening.py
+(equivalent to: clb-analysis screen --input-dir ... --query-file ... --blast-dir ... --output ...)
+"""
+from clb_analysis.cli import main as cli_main
+
+def main():
+    """
+    Main execution function
+    """
+    # ===== User Configuration Area =====
+    # BLAST executable directory - Required modification
+    blast_dir = "/path/to/blast/bin"  # ← Specify your BLAST installation directory
+
+    # Input directory (combined FASTA files from fastaseq.py) - Required modification
+    input_dir = "/path/to/combined/fasta/files"  # ← Please modify here
+
+    # Query file specification - Required modification
+    query_file = "/path/to/clb_genes.fna"  # ← Specify full path to clb_genes.fna file
+
+    # Output TSV file - Required modification
+    output_tsv = "/path/to/output/pks_screening.tsv"  # ← Please modify here
+
+    # Positivity criterion: "clbB" (clbB only) or "cluster" (all 19 clb genes)
+    CRITERION = "clbB"
+    # Number of unique clb reads required for a positive call (1 = ">0 reads")
+    HIT_THRESHOLD = 1
+
+    # Batch schedule: first batch size (reads) and growth factor of later batches
+    INITIAL_BATCH = 100000
+    GROWTH_FACTOR = 2.0
+    # Negative once a sample at MIN_RPM would have been detected with this probability (0 = off)
+    TARGET_CONFIDENCE = 0.95
+    # Maximum screening depth (reads); negative if not met by then (0 = no limit)
+    MAX_DEPTH = 0
+
+    # Random subsampling (1.0 = use all reads) and random seed
+    SUBSAMPLE_FRACTION = 1.0
+    SEED = 0
+
+    # Abundance (RPM) a negative call should rule out; used for TARGET_CONFIDENCE and the Confidence column
+    # (default: clbB ROC threshold reported in the paper)
+    MIN_RPM = 0.0166
+
+    # BLAST search parameters (same meaning as in BlastDB(for loop).sh)
+    PERC_IDENTITY = 97
+    EVALUE = 1e-5
+    NUM_THREADS = 2
+    # ===== End of User Configuration Area =====
+
+    return cli_main(["screen", "--input-dir", input_dir, "--query-file", query_file,
+                     "--blast-dir", blast_dir, "--output", output_tsv,
+                     "--criterion", CRITERION, "--hit-threshold", str(HIT_THRESHOLD),
+                     "--initial-batch", str(INITIAL_BATCH), "--growth-factor", str(GROWTH_FACTOR),
+                     "--max-depth", str(MAX_DEPTH), "--target-confidence", str(TARGET_CONFIDENCE),
+                     "--subsample-fraction", str(SUBSAMPLE_FRACTION),
+                     "--seed", str(SEED), "--min-rpm", str(MIN_RPM),
+                     "--perc-identity", str(PERC_IDENTITY), "--evalue", str(EVALUE),
+                     "--num-threads", str(NUM_THREADS)])
+
+if __name__ == "__main__":
+    raise SystemExit(main())
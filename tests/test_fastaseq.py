@@ -0,0 +1,53 @@
+"""
+Regression check: block-based header rewriting in clb_analysis.fastaseq must give the
+same output as the original line-by-line fastaseq.py implementation
+"""
+import io
+
+import pytest
+
+from clb_analysis.fastaseq import process_and_write_fasta
+
+def original_process_and_write_fasta(input_path, suffix, output_handle):
+    # Original fastaseq.py implementation (text mode, line by line)
+    with open(input_path, 'r') as infile:
+        for line in infile:
+            if line.startswith('>'):
+                parts = line.strip().split(None, 1)
+                header = parts[0]
+                rest = parts[1] if len(parts) > 1 else ""
+                new_header = f"{header}:{suffix}"
+                if rest:
+                    new_header += " " + rest
+                output_handle.write(new_header + "\n")
+            else:
+                output_handle.write(line)
+
+CASES = {
+    "plain": b">r1 1 length=4\nACGT\n>r2\nGGGG\n",
+    "crlf": b">r1 desc\r\nACGT\r\nAC\r\n>r2\r\nGG\r\n",
+    "lone_cr": b">r1 desc\rACGT\r>r2\rGG\r",
+    "header_whitespace": b">r1\tdesc\tmore\n ACGT \n>r2  a  b \t\n>r3 \nGG\n>  r4\n>\nA\n",
+    "no_final_newline_sequence": b">r1 desc\nACGT\n>r2\nGG",
+    "no_final_newline_header": b">r1\nACGT\n>r2 last",
+    "mixed": b">r1 a\r\nAC\n>r2\tb \rGG\r\n\r\n>r3\n",
+}
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 7, 4096])
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_matches_original(tmp_path, name, block_size):
+    fasta = tmp_path / "in.fa"
+    fasta.write_bytes(CASES[name])
+
+    expected = io.StringIO()
+    original_process_and_write_fasta(str(fasta), 1, expected)
+    expected = expected.getvalue().encode()
+    if not expected.endswith(b"\n"):
+        # The block version always ends with a newline, so that the _2 file starts on a new line
+        expected += b"\n"
+
+    output = io.BytesIO()
+    n_reads = process_and_write_fasta(str(fasta), 1, output, block_size=block_size)
+
+    assert output.getvalue() == expected
+    assert n_reads == expected.count(b"\n>") + expected.startswith(b">")